@@ -0,0 +1,319 @@
+"""
+Uniform access to the status and decoded body of responses and requests.
+
+Supported responses are Django Rest Framework responses (``data``), any
+response with ``status_code`` and ``content`` (Django, requests, httpx),
+Django streaming responses, WSGIResponse objects, plain WSGI ``(status
+line, header list, body list)`` tuples and raw bytes. More can be supported
+with register_adapter.
+"""
+import codecs
+import json
+
+try:
+    from orjson import loads as _fast_loads
+except ImportError:
+    _fast_loads = None
+
+try:
+    from django.http.request import RawPostDataException
+except ImportError:
+    class RawPostDataException(Exception):
+        """
+        Stands in for Django's exception when Django isn't installed.
+        """
+
+# Attribute used to cache the decoded body on responses and requests.
+CACHE_ATTR = '_abe_decoded_body'
+
+_missing = object()
+
+
+def decode_json(data):
+    """
+    Decode a JSON body given as bytes, bytearray or memoryview.
+
+    The data is read through a memoryview, so it is never copied before
+    being decoded. An empty body decodes to None.
+
+    >>> decode_json(memoryview(b'{"id": 1}')) == {'id': 1}
+    True
+    """
+    view = memoryview(data)
+    if not view:
+        return None
+    if _fast_loads is not None:
+        return _fast_loads(view)
+    return json.loads(codecs.decode(view, 'utf-8'))
+
+
+def decode_json_body(body, content_type=None):
+    """
+    Decode a JSON body, failing the assertion if it isn't JSON.
+
+    :param content_type:
+        The Content-Type of the body, if known. It must be a JSON type.
+    """
+    if content_type is not None and not is_json(content_type):
+        raise AssertionError(
+            'Expected a JSON body, got Content-Type {0}: {1!r}'.format(
+                content_type, _preview(body)))
+    try:
+        return decode_json(body)
+    except ValueError as exc:
+        raise AssertionError(
+            'Body is not valid JSON ({0}): {1!r}'.format(exc, _preview(body)))
+
+
+def _preview(body, length=200):
+    return bytes(memoryview(body)[:length])
+
+
+def header_value(headers, name):
+    """
+    Return the value of a header, or None.
+
+    headers is either a case-insensitive mapping (requests, httpx, Django)
+    or a list of (name, value) pairs, as str or bytes (WSGI, ASGI).
+    """
+    if headers is None:
+        return None
+    if hasattr(headers, 'get'):
+        return headers.get(name)
+    name = name.lower()
+    for key, value in headers:
+        if isinstance(key, bytes):
+            key, value = key.decode('latin-1'), value.decode('latin-1')
+        if key.lower() == name:
+            return value
+    return None
+
+
+def join_chunks(chunks):
+    """
+    Join an iterable of byte chunks, avoiding a copy for a single chunk.
+    """
+    chunks = list(chunks)
+    if len(chunks) == 1:
+        return chunks[0]
+    return b''.join(chunks)
+
+
+def cached_body(obj, decode):
+    """
+    Return decode(), cached on obj when it accepts new attributes.
+    """
+    try:
+        value = vars(obj).get(CACHE_ATTR, _missing)
+    except TypeError:
+        return decode()
+    if value is _missing:
+        value = decode()
+        setattr(obj, CACHE_ATTR, value)
+    return value
+
+
+class ResponseAdapter(object):
+    """
+    Base class for response adapters.
+
+    Subclasses implement accepts, status_code and data. status_code is
+    None when the response doesn't carry one.
+    """
+    __slots__ = ('response',)
+
+    def __init__(self, response):
+        self.response = response
+
+    @classmethod
+    def accepts(cls, response):
+        raise NotImplementedError
+
+    @property
+    def status_code(self):
+        return None
+
+    @property
+    def data(self):
+        raise NotImplementedError
+
+
+class BytesAdapter(ResponseAdapter):
+    """
+    A raw body, with no status. Bytes can't hold the cached body.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def accepts(cls, response):
+        return isinstance(response, (bytes, bytearray, memoryview))
+
+    @property
+    def data(self):
+        return decode_json_body(self.response)
+
+
+class WSGIResponse(object):
+    """
+    The response of a WSGI application: status line, header list and body.
+
+    The body iterable is read and closed once, when the response is
+    created, so the response can be checked any number of times and caches
+    its decoded body like other responses.
+    """
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        try:
+            self.content = join_chunks(body)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+    @property
+    def status_code(self):
+        return int(self.status.split(' ', 1)[0])
+
+
+class WSGIAdapter(ResponseAdapter):
+    """
+    A (status line, header list, body list) tuple.
+
+    Tuples can't hold the cached body, so the body is decoded on each use
+    and must be a list, which can be read again. Wrap other body iterables
+    in a WSGIResponse.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def accepts(cls, response):
+        return isinstance(response, tuple) and len(response) == 3
+
+    @property
+    def status_code(self):
+        return int(self.response[0].split(' ', 1)[0])
+
+    @property
+    def data(self):
+        status, headers, body = self.response
+        if not isinstance(body, (list, tuple)):
+            raise TypeError(
+                'The body of a WSGI response tuple must be a list, wrap '
+                'other body iterables in a WSGIResponse')
+        return decode_json_body(
+            join_chunks(body), header_value(headers, 'Content-Type'))
+
+
+class DRFAdapter(ResponseAdapter):
+    """
+    A Django Rest Framework response, whose data is already decoded.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def accepts(cls, response):
+        return hasattr(response, 'data') and hasattr(response, 'status_code')
+
+    @property
+    def status_code(self):
+        return self.response.status_code
+
+    @property
+    def data(self):
+        return self.response.data
+
+
+class ContentAdapter(ResponseAdapter):
+    """
+    A Django, requests, httpx or WSGIResponse response with status_code
+    and content, or a Django streaming response with streaming_content
+    instead.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def accepts(cls, response):
+        return hasattr(response, 'status_code') and (
+            hasattr(response, 'content') or
+            hasattr(response, 'streaming_content')
+        )
+
+    @property
+    def status_code(self):
+        return self.response.status_code
+
+    @property
+    def data(self):
+        return cached_body(self.response, self._decode)
+
+    def _decode(self):
+        response = self.response
+        if getattr(response, 'streaming', False):
+            # Django streaming responses have no content attribute.
+            body = join_chunks(response.streaming_content)
+        else:
+            body = response.content
+        return decode_json_body(body, self._content_type())
+
+    def _content_type(self):
+        response = self.response
+        headers = getattr(response, 'headers', None)
+        if headers is None and hasattr(response, 'has_header'):
+            # Django before 3.2 has no headers attribute.
+            return response.get('Content-Type')
+        return header_value(headers, 'Content-Type')
+
+
+ADAPTERS = [BytesAdapter, WSGIAdapter, DRFAdapter, ContentAdapter]
+
+
+def register_adapter(adapter):
+    """
+    Register a ResponseAdapter subclass, tried before the built-in ones.
+    """
+    ADAPTERS.insert(0, adapter)
+    return adapter
+
+
+def get_adapter(response):
+    """
+    Return a ResponseAdapter for response.
+    """
+    for adapter in ADAPTERS:
+        if adapter.accepts(response):
+            return adapter(response)
+    raise TypeError(
+        'Unsupported response type: {0}'.format(type(response).__name__))
+
+
+def is_json(content_type):
+    content_type = content_type.split(';', 1)[0].strip().lower()
+    return (content_type == 'application/json' or
+            content_type.endswith('+json'))
+
+
+def request_data(wsgi_request, parsed_request=None):
+    """
+    Return the decoded body of a Django request.
+
+    JSON bodies are decoded (once, the result is cached on the request);
+    otherwise the form data in POST is used.
+
+    :param parsed_request:
+        The request as seen by the view, e.g. the Django Rest Framework
+        request. If the view already read the request stream, its parsed
+        data is used instead.
+    """
+    if not is_json(wsgi_request.META.get('CONTENT_TYPE', '')):
+        return wsgi_request.POST
+    try:
+        body = wsgi_request.body
+    except RawPostDataException:
+        if parsed_request is not None:
+            return parsed_request.data
+        raise AssertionError(
+            'The request body was already read by the view, and no parsed '
+            'request is available to compare it with'
+        )
+    return cached_body(wsgi_request, lambda: decode_json_body(body))
@@ -0,0 +1,146 @@
+"""
+Async assertions for ASGI applications and async test clients.
+
+Requires Python 3.6+.
+"""
+import asyncio
+
+from .adapters import decode_json_body, header_value
+from .unittest import AbeTestMixin
+
+
+def scope_to_meta(scope):
+    """
+    Build a WSGI-style environ, like Django's request.META, from a scope.
+
+    Header names and values arrive as byte pairs and the query string as
+    raw bytes; both are decoded as latin-1, as WSGI servers do.
+    """
+    meta = {
+        'REQUEST_METHOD': scope['method'],
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        if name in meta:
+            meta[name] += ',' + value
+        else:
+            meta[name] = value
+    return meta
+
+
+async def read_body(body):
+    """
+    Join a body given as bytes, or as an (async) iterable of chunks.
+    """
+    if body is None or isinstance(body, (bytes, bytearray, memoryview)):
+        return body
+    if hasattr(body, '__aiter__'):
+        return b''.join([chunk async for chunk in body])
+    return b''.join(body)
+
+
+async def read_response(response):
+    """
+    Return (status, headers, body) for an ASGI response.
+
+    response is either the list of messages the application sent
+    (``http.response.start`` followed by ``http.response.body`` ones), or an
+    async test client response with ``status_code``, ``headers`` and an
+    ``aiter_bytes()`` method or ``content`` attribute.
+    """
+    if isinstance(response, (list, tuple)):
+        status, headers, chunks = None, [], []
+        for message in response:
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                headers = message.get('headers', [])
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+        return status, headers, b''.join(chunks)
+
+    if hasattr(response, 'aiter_bytes'):
+        body = await read_body(response.aiter_bytes())
+    else:
+        body = response.content
+    return response.status_code, response.headers, body
+
+
+class AsyncAbeTestMixin(AbeTestMixin):
+    """
+    Mixin for unittest.TestCase to check ASGI requests and responses.
+
+    All assertions are coroutines, so that many of them can run
+    concurrently with asyncio.gather. Samples are loaded in the default
+    executor, so that reading a big corpus doesn't block the event loop.
+
+    """
+
+    async def aload_sample(self, sample_path):
+        """
+        Load a sample file into an AbeMock object, off the event loop.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, self.load_sample, sample_path
+        )
+
+    async def assert_matches_asgi_request(self, sample_request, scope,
+                                          body=None, non_strict=None):
+        """
+        Check that the sample request and ASGI scope match.
+
+        :param body:
+            The request body, as bytes or an (async) iterable of chunks.
+            It is assumed to be JSON, and only checked if given.
+        """
+        non_strict = non_strict or []
+        self.assert_matches_request_meta(
+            sample_request, scope_to_meta(scope), non_strict)
+
+        body = await read_body(body)
+        if 'body' in sample_request and body is not None:
+            self.assert_data_equal(
+                decode_json_body(body), sample_request['body'], non_strict)
+
+    async def assert_matches_asgi_response(self, sample_response, response,
+                                           non_strict=None):
+        """
+        Check that the sample response and ASGI response match.
+        """
+        non_strict = non_strict or []
+        status, headers, body = await read_response(response)
+        self.assertEqual(status, sample_response.status)
+        if 'body' in sample_response:
+            content_type = header_value(headers, 'Content-Type')
+            self.assert_data_equal(
+                decode_json_body(body, content_type), sample_response.body,
+                non_strict)
+
+    async def assert_matches_asgi_sample(
+        self, path, label, scope, response, body=None,
+        non_strict_response=None, non_strict_request=None
+    ):
+        """
+        Check an ASGI request and response against a sample.
+
+        :param scope:
+            The ASGI scope of the request.
+        :param response:
+            The ASGI response, see read_response.
+        :param body:
+            The request body, see assert_matches_asgi_request.
+        """
+        sample = await self.aload_sample(path)
+        sample_request = sample.examples[label].request
+        sample_response = sample.examples[label].response
+        self.compile_sample_request(path, label, sample_request)
+
+        await self.assert_matches_asgi_response(
+            sample_response, response, non_strict=non_strict_response)
+        await self.assert_matches_asgi_request(
+            sample_request, scope, body=body, non_strict=non_strict_request)
@@ -0,0 +1,113 @@
+import json
+try:
+    from urlparse import parse_qsl
+except ImportError:
+    from urllib.parse import parse_qsl
+
+
+# CGI variables that carry a header without the HTTP_ prefix.
+_UNPREFIXED_HEADERS = ('CONTENT_TYPE', 'CONTENT_LENGTH')
+
+
+def wsgi_header_keys(name):
+    """
+    The keys a header may have in a WSGI environ (request.META).
+
+    WSGI keys are upper case, so this makes header names case-insensitive.
+
+    >>> wsgi_header_keys('x-requested-with')
+    ('HTTP_X_REQUESTED_WITH',)
+    >>> wsgi_header_keys('Content-Type')
+    ('CONTENT_TYPE', 'HTTP_CONTENT_TYPE')
+    """
+    key = name.upper().replace('-', '_')
+    if key in _UNPREFIXED_HEADERS:
+        return (key, 'HTTP_' + key)
+    return ('HTTP_' + key,)
+
+
+def parse_query(query_string):
+    """
+    Map each query parameter to the list of its values, in request order.
+
+    >>> sorted(parse_query('tag=a&page=1&tag=b&q=').items())
+    [('page', ['1']), ('q', ['']), ('tag', ['a', 'b'])]
+    """
+    params = {}
+    for key, value in parse_qsl(query_string, keep_blank_values=True):
+        params.setdefault(key, []).append(value)
+    return params
+
+
+def _query_value(value):
+    # Query strings are text: sample numbers and booleans are compared in
+    # their JSON form, e.g. 1 -> '1' and true -> 'true'.
+    if value is None or isinstance(value, (bool, int, float)):
+        return json.dumps(value)
+    return value
+
+
+def compile_headers(spec_data):
+    """
+    Expected headers as (name, WSGI keys, value) tuples.
+
+    The WSGI keys are computed here, once, so that checking a request only
+    takes dict lookups.
+    """
+    return tuple(
+        (name, wsgi_header_keys(name), value)
+        for name, value in spec_data.items()
+    )
+
+
+def compile_query_params(spec_data):
+    """
+    Expected query parameters as (name, tuple of values) tuples.
+
+    A single value is expected to appear exactly once; a list of values
+    must match the repeated parameter in order.
+    """
+    compiled = []
+    for name, value in spec_data.items():
+        if isinstance(value, (list, tuple)):
+            values = tuple(_query_value(item) for item in value)
+        else:
+            values = (_query_value(value),)
+        compiled.append((name, values))
+    return tuple(compiled)
+
+
+class CompiledRequest(object):
+    """
+    The parts of a sample request checked against request META.
+
+    Built once per sample request, see compile_request. It is never
+    modified afterwards, so it can be shared.
+    """
+    __slots__ = ('url', 'method', 'headers', 'query_params')
+
+    def __init__(self, sample_request):
+        self.url = sample_request.get('url')
+        self.method = sample_request.get('method')
+        self.headers = None
+        if 'headers' in sample_request:
+            self.headers = compile_headers(sample_request['headers'])
+        self.query_params = None
+        if 'queryParams' in sample_request:
+            self.query_params = compile_query_params(
+                sample_request['queryParams'])
+
+
+def compile_request(sample_request):
+    """
+    Return the CompiledRequest for a sample request.
+
+    It is cached on AbeRequest records, so each label is compiled once,
+    until one of the fields it is built from is set again.
+    """
+    compiled = getattr(sample_request, '_compiled', None)
+    if compiled is None:
+        compiled = CompiledRequest(sample_request)
+        if hasattr(type(sample_request), '_compiled'):
+            sample_request._compiled = compiled
+    return compiled
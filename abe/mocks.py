@@ -1,10 +1,131 @@
 import json
 import warnings
 
-from supermutes.dot import dotify
+from .utils import freeze, intern_string
 
 
-class AbeMock(object):
+class AbeRecord(object):
+    """
+    Compact, slot-based holder for the fields of an ABE object.
+
+    Known fields are stored in slots. Any other field found in the sample is
+    kept in the ``_extra`` dict. Fields are reachable both as attributes and
+    as keys (e.g. ``request.url`` or ``request['url']``), and missing fields
+    are not ``in`` the record.
+
+    """
+    __slots__ = ('_extra',)
+    _fields = ()
+
+    def __init__(self, data, consed=None):
+        """
+        :param consed: see abe.utils.freeze
+        """
+        self._extra = None
+        for key, value in data.items():
+            self._set_field(key, value, consed)
+
+    def _set_field(self, key, value, consed=None):
+        value = freeze(value, consed)
+        if key in self._fields:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[intern_string(key)] = value
+
+    def _get_extra(self):
+        # Read through object.__getattribute__: copies are created without
+        # calling __init__, and must not recurse into __getattr__.
+        try:
+            return object.__getattribute__(self, '_extra')
+        except AttributeError:
+            return None
+
+    def __getattr__(self, attr):
+        extra = self._get_extra()
+        if extra and attr in extra:
+            return extra[attr]
+        raise AttributeError(attr)
+
+    def __getitem__(self, key):
+        # Read the slot or _extra directly: going through getattr would
+        # return methods, e.g. for a field named "keys".
+        if key in self._fields:
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        extra = self._get_extra()
+        if extra and key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self._fields:
+            return hasattr(self, key)
+        return key in (self._get_extra() or ())
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        keys = [field for field in self._fields if hasattr(self, field)]
+        return keys + list(self._get_extra() or ())
+
+    def __getstate__(self):
+        return dict(
+            (slot, getattr(self, slot))
+            for cls in type(self).__mro__
+            for slot in getattr(cls, '__slots__', ())
+            if hasattr(self, slot)
+        )
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(
+            type(self).__name__, dict((key, self[key]) for key in self.keys())
+        )
+
+
+class AbeRequest(AbeRecord):
+    _fields = (
+        'description', 'url', 'method', 'headers', 'queryParams', 'body',
+    )
+    # _compiled holds the CompiledRequest, see abe.matchers.
+    __slots__ = _fields + ('_compiled',)
+    # Fields the CompiledRequest is built from.
+    _compiled_fields = ('url', 'method', 'headers', 'queryParams')
+
+    def __setattr__(self, attr, value):
+        super(AbeRequest, self).__setattr__(attr, value)
+        if attr in self._compiled_fields:
+            self._compiled = None
+
+
+class AbeResponse(AbeRecord):
+    __slots__ = _fields = (
+        'description', 'status', 'headers', 'body',
+    )
+
+
+class AbeExample(AbeRecord):
+    __slots__ = _fields = ('description', 'request', 'response')
+
+    def _set_field(self, key, value, consed=None):
+        if key == 'request':
+            self.request = AbeRequest(value, consed)
+        elif key == 'response':
+            self.response = AbeResponse(value, consed)
+        else:
+            super(AbeExample, self)._set_field(key, value, consed)
+
+
+class AbeMock(AbeRecord):
+    __slots__ = _fields = ('description', 'url', 'method', 'examples')
 
     def __init__(self, data):
         """
@@ -19,15 +140,23 @@ class AbeMock(object):
             with open(data, 'r') as f:
                 data = json.load(f)
 
-        # map JSON fields to attributes
-        self.__dict__ = data
+        # map JSON fields to attributes. Identical fragments within the
+        # file are shared; the table is dropped once the file is loaded.
+        consed = {}
+        examples = data.get('examples', {})
+        super(AbeMock, self).__init__(
+            dict((key, value) for key, value in data.items()
+                 if key != 'examples'),
+            consed
+        )
 
         # Make all example requests and reponses accessible via dot syntax
         # (e.g. mock["OK"].request.status)
-        for key, value in self.examples.items():
+        self.examples = {}
+        for key, value in examples.items():
             # Add the request URL automatically if missing.
             self._feed_inherited_fields(value, 'request', ['url', 'method'])
-            self.examples[key] = dotify(value)
+            self.examples[intern_string(key)] = AbeExample(value, consed)
 
     @classmethod
     def from_filename(cls, filename):
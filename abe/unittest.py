@@ -1,11 +1,11 @@
 import os
-try:
-    from urlparse import parse_qs
-except ImportError:
-    from urllib.parse import parse_qs
 
+from .adapters import get_adapter, request_data
+from .matchers import (
+    compile_headers, compile_query_params, compile_request, parse_query,
+)
 from .mocks import AbeMock
-from .utils import normalize, subkeys
+from .utils import normalize, subkeys, thaw
 
 
 class AbeTestMixin(object):
@@ -21,6 +21,14 @@ class AbeTestMixin(object):
     # Root directory to load samples from.
     samples_root = '.'
 
+    # Verdicts for (real, sample) pairs during a single assert_data_equal.
+    _verified = None
+
+    # CompiledRequests by (sample path, label), with the modification time
+    # of the sample file they were compiled from. They are never modified,
+    # so unlike loaded samples they can be shared by all test cases.
+    _compiled_requests = {}
+
     def load_sample(self, sample_path):
         """
         Load a sample file into an AbeMock object.
@@ -28,14 +36,33 @@ class AbeTestMixin(object):
         sample_filename = os.path.join(self.samples_root, sample_path)
         return AbeMock.from_filename(sample_filename)
 
+    def compile_sample_request(self, path, label, sample_request):
+        """
+        Attach the CompiledRequest for a sample label to sample_request.
+
+        Each label is compiled once, until its sample file changes.
+        """
+        sample_filename = os.path.abspath(
+            os.path.join(self.samples_root, path))
+        key = (sample_filename, label)
+        mtime = os.path.getmtime(sample_filename)
+        cached = self._compiled_requests.get(key)
+        if cached is not None and cached[0] == mtime:
+            sample_request._compiled = cached[1]
+        else:
+            self._compiled_requests[key] = (
+                mtime, compile_request(sample_request))
+
     def get_sample_request(self, path, label):
         """
         Get the request body to send for a specific sample label.
 
+        The body is returned as a mutable copy of the (read-only) sample.
+
         """
         sample = self.load_sample(path)
         sample_request = sample.examples[label].request
-        return sample_request.body
+        return thaw(sample_request.body)
 
     def assert_item_matches(self, real, sample):
         """
@@ -55,11 +82,30 @@ class AbeTestMixin(object):
         :param non_strict:
             Names of fields to match non-strictly. In current implementation,
             only check for field presence.
+
+        Containers already verified against the same sample node within
+        this assertion are not compared again. Identical sample fragments
+        are shared, but this only helps when the response also reuses the
+        same objects, e.g. a serializer returning one cached dict many
+        times. Bodies decoded from JSON never repeat objects, so each of
+        their items is compared in full.
         """
         non_strict = non_strict or []
+        if self._verified is None:
+            self._verified = {}
+            try:
+                return self.assert_data_equal(real, sample, non_strict)
+            finally:
+                self._verified = None
+
+        memo_key = None
+        if isinstance(real, (list, dict)):
+            memo_key = (id(real), id(sample), tuple(non_strict))
+            if memo_key in self._verified:
+                return
         try:
             if isinstance(real, list):
-                self.assertIsInstance(sample, list)
+                self.assertIsInstance(sample, (list, tuple))
                 self.assert_data_list_equal(real, sample, non_strict)
             elif isinstance(real, dict):
                 self.assertIsInstance(sample, dict)
@@ -69,6 +115,9 @@ class AbeTestMixin(object):
         except AssertionError as exc:
             message = str(exc) + '\n{}\n{}\n\n'.format(real, sample)
             raise type(exc)(message)
+        if memo_key is not None:
+            # Keep both objects alive so that their ids are not reused.
+            self._verified[memo_key] = (real, sample)
 
     def assert_data_dict_equal(self, real, sample, non_strict=None):
         """
@@ -114,73 +163,107 @@ class AbeTestMixin(object):
     def assert_headers_contain(self, response_data, spec_data):
         """
         response_data headers contain all headers defined in spec_data
+
+        A header is looked up by its exact name first, then by its WSGI
+        keys (HTTP_X_CUSTOM, CONTENT_TYPE), which are case-insensitive.
+        spec_data can also be the result of compile_headers.
         """
-        for expected_header, expected_value in spec_data.items():
-            django_expected_header = (
-                'HTTP_' + expected_header.upper().replace('-', '_')
-            )
-            actual_val = response_data.get(
-                expected_header,
-                response_data.get(django_expected_header)
-            )
+        if isinstance(spec_data, dict):
+            spec_data = compile_headers(spec_data)
+        for expected_header, keys, expected_value in spec_data:
+            actual_value = response_data.get(expected_header)
+            if actual_value is None:
+                for key in keys:
+                    if key in response_data:
+                        actual_value = response_data[key]
+                        break
             self.assertEqual(
-                expected_value, actual_val,
+                expected_value, actual_value,
                 "Incorrect or missing value specified for "
                 "header {0}".format(expected_header)
             )
 
     def assert_query_params_equal(self, request_data, spec_data):
-        qs = parse_qs(request_data)
-        for k, expected_value in spec_data.items():
+        """
+        The query string request_data has all params defined in spec_data
+
+        A list in spec_data must match all values of a repeated param, in
+        order. spec_data can also be the result of compile_query_params.
+        """
+        if isinstance(spec_data, dict):
+            spec_data = compile_query_params(spec_data)
+        params = parse_query(request_data)
+        for k, expected_values in spec_data:
             try:
-                actual_value = qs[k]
+                actual_values = params[k]
             except KeyError:
                 raise AssertionError('Missing {0} from request'.format(k))
+            self.assertEqual(
+                list(expected_values), actual_values,
+                'Incorrect value for query param {0}'.format(k)
+            )
 
-            if len(actual_value) == 1:
-                actual_value = actual_value[0]
-            self.assertEqual(expected_value, actual_value)
-
-    def assert_matches_request(self, sample_request, wsgi_request,
-                               non_strict=None):
+    def assert_matches_request_meta(self, sample_request, meta,
+                                    non_strict=None):
         """
-        Check that the sample request and wsgi request match.
+        Check that the sample request and request META match.
+
+        The sample request is compiled only once, see compile_request.
         """
         non_strict = non_strict or []
+        compiled = compile_request(sample_request)
 
         if 'url' not in non_strict:
-            self.assertEqual(wsgi_request.META['PATH_INFO'],
-                             sample_request['url'])
+            self.assertEqual(meta['PATH_INFO'], compiled.url)
         if 'method' not in non_strict:
-            self.assertEqual(wsgi_request.META['REQUEST_METHOD'],
-                             sample_request['method'])
+            self.assertEqual(meta['REQUEST_METHOD'], compiled.method)
 
-        if 'headers' in sample_request and 'headers' not in non_strict:
-            self.assert_headers_contain(
-                wsgi_request.META, sample_request['headers']
-            )
+        if compiled.headers is not None and 'headers' not in non_strict:
+            self.assert_headers_contain(meta, compiled.headers)
 
-        if 'queryParams' in sample_request and 'queryParams' not in non_strict:
+        if (compiled.query_params is not None and
+                'queryParams' not in non_strict):
             self.assert_query_params_equal(
-                wsgi_request.META['QUERY_STRING'],
-                sample_request['queryParams']
+                meta['QUERY_STRING'], compiled.query_params
             )
 
+    def assert_matches_request(self, sample_request, wsgi_request,
+                               non_strict=None, parsed_request=None):
+        """
+        Check that the sample request and wsgi request match.
+
+        JSON request bodies are decoded, other bodies are read from POST.
+
+        :param parsed_request:
+            The request as parsed by the view, e.g. a Django Rest Framework
+            request. Its data is used if the view already consumed the body.
+        """
+        non_strict = non_strict or []
+        self.assert_matches_request_meta(
+            sample_request, wsgi_request.META, non_strict)
+
         if 'body' in sample_request:
             self.assert_data_equal(
-                wsgi_request.POST, sample_request['body'], non_strict)
+                request_data(wsgi_request, parsed_request),
+                sample_request['body'],
+                non_strict)
 
     def assert_matches_response(self, sample_response, wsgi_response,
                                 non_strict=None):
         """
         Check that the sample response and wsgi response match.
+
+        wsgi_response can be any response supported by abe.adapters. Its
+        status is not checked if it has none, e.g. for raw bytes.
         """
         non_strict = non_strict or []
-        self.assertEqual(wsgi_response.status_code, sample_response.status)
+        adapter = get_adapter(wsgi_response)
+        status_code = adapter.status_code
+        if status_code is not None:
+            self.assertEqual(status_code, sample_response.status)
         if 'body' in sample_response:
-            response_parsed = wsgi_response.data
             self.assert_data_equal(
-                response_parsed, sample_response.body, non_strict)
+                adapter.data, sample_response.body, non_strict)
 
     def assert_matches_sample(
         self, path, label, response, non_strict_response=None,
@@ -195,7 +278,9 @@ class AbeTestMixin(object):
             The label for a specific sample request/response, e.g. 'OK'
         :param response:
             The actual API response we want to match with the sample.
-            It is assumed to be a Django Rest Framework response object
+            It can be any response supported by abe.adapters. The request
+            is only checked if the response has a wsgi_request, as Django
+            test client responses do.
         :param non_strict:
             List of fields that will not be checked for strict matching.
             You can use this to include server-generated fields whose exact
@@ -206,9 +291,18 @@ class AbeTestMixin(object):
         sample = self.load_sample(path)
         sample_request = sample.examples[label].request
         sample_response = sample.examples[label].response
+        self.compile_sample_request(path, label, sample_request)
 
         self.assert_matches_response(
             sample_response, response, non_strict=non_strict_response)
-        self.assert_matches_request(
-            sample_request, response.wsgi_request,
-            non_strict=non_strict_request)
+        wsgi_request = getattr(response, 'wsgi_request', None)
+        if wsgi_request is not None:
+            # Django Rest Framework responses keep the request they were
+            # rendered for, with the body already parsed.
+            renderer_context = getattr(response, 'renderer_context', None)
+            parsed_request = None
+            if isinstance(renderer_context, dict):
+                parsed_request = renderer_context.get('request')
+            self.assert_matches_request(
+                sample_request, wsgi_request, non_strict=non_strict_request,
+                parsed_request=parsed_request)
@@ -1,5 +1,9 @@
 from datetime import datetime
 import sys
+try:
+    from sys import intern
+except ImportError:
+    pass  # Python 2, where intern is a builtin
 
 _PY3 = sys.version_info >= (3, 0)
 
@@ -44,3 +48,137 @@ def subkeys(original, key):
     new_keys = filter(lambda s: s.startswith(key + '.'), original)
     new_keys = list(map(lambda s: s[len(key) + 1:], new_keys))
     return new_keys
+
+
+# Strings longer than this are assumed to be unique enough that interning
+# them would only grow the intern table.
+INTERN_MAX_LENGTH = 100
+
+
+def intern_string(value):
+    """
+    Return a canonical instance of a string shared across all samples.
+
+    Keys such as "status" or "Content-Type" are repeated in every sample
+    file, so keeping a single copy of each saves memory on big corpora.
+    Strings are interned with sys.intern, so unused ones can still be
+    freed. (Python 2 can only intern byte strings, others are unchanged.)
+
+    >>> a = intern_string(''.join(['Content-', 'Type']))
+    >>> a is intern_string(''.join(['Content-', 'Type']))
+    True
+    """
+    if isinstance(value, str):
+        return intern(value)
+    return value
+
+
+class DotDict(dict):
+    """
+    A dict that allows dot notation access to its values.
+
+    >>> d = DotDict({'a': 12})
+    >>> d.a
+    12
+    >>> d.b = 5
+    >>> d['b']
+    5
+    """
+    __slots__ = ()
+
+    def __getattr__(self, attr):
+        try:
+            return self[attr]
+        except KeyError:
+            raise AttributeError(attr)
+
+    __setattr__ = dict.__setitem__
+    __delattr__ = dict.__delitem__
+
+
+class FrozenDict(dict):
+    """
+    A read-only dict that allows dot notation access to its values.
+
+    Used to hold sample bodies, which are never modified once loaded.
+    """
+    __slots__ = ()
+
+    def __getattr__(self, attr):
+        try:
+            return self[attr]
+        except KeyError:
+            raise AttributeError(attr)
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('Sample data is read-only, use thaw() for a copy')
+
+    __setitem__ = __delitem__ = _readonly
+    __setattr__ = __delattr__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+def _node_key(value):
+    """
+    Key identifying a child of a frozen node.
+
+    Containers are already hash-consed, so their identity is enough.
+    """
+    if isinstance(value, (dict, tuple)):
+        return id(value)
+    return (type(value), value)
+
+
+def freeze(data, consed=None):
+    """
+    Convert loaded JSON into a compact, read-only representation.
+
+    Dicts become FrozenDicts with interned keys, lists become tuples and
+    short strings are interned.
+
+    :param consed:
+        Optional dict of frozen nodes, keyed by their contents. Identical
+        subtrees frozen with the same dict are shared, e.g. within a sample
+        file. The dict keeps its nodes alive, so don't keep it longer than
+        the data it was used for.
+
+    >>> consed = {}
+    >>> a = freeze({'user': {'id': 1}}, consed)
+    >>> b = freeze([{'id': 1}], consed)
+    >>> a['user'] is b[0]
+    True
+    """
+    if isinstance(data, dict):
+        node = FrozenDict(
+            (intern_string(key), freeze(value, consed))
+            for key, value in data.items()
+        )
+        if consed is None:
+            return node
+        key = (FrozenDict, tuple(sorted(
+            (k, _node_key(v)) for k, v in node.items()
+        )))
+    elif isinstance(data, (list, tuple)):
+        node = tuple(freeze(item, consed) for item in data)
+        if consed is None:
+            return node
+        key = (tuple, tuple(_node_key(item) for item in node))
+    elif isinstance(data, unicode) and len(data) <= INTERN_MAX_LENGTH:
+        return intern_string(data)
+    else:
+        return data
+    return consed.setdefault(key, node)
+
+
+def thaw(data):
+    """
+    Return a mutable deep copy of frozen data, with DotDicts and lists.
+    """
+    if isinstance(data, dict):
+        return DotDict((key, thaw(value)) for key, value in data.items())
+    elif isinstance(data, (list, tuple)):
+        return [thaw(item) for item in data]
+    return data
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Measure the memory retained by loading every sample under a directory.
+
+Usage:
+
+    python scripts/measure_memory.py path/to/samples_root
+
+Requires Python 3.4+ (tracemalloc).
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from abe.mocks import AbeMock  # noqa: E402
+
+
+def sample_files(samples_root):
+    for dirpath, dirnames, filenames in os.walk(samples_root):
+        for filename in sorted(filenames):
+            if filename.endswith('.json'):
+                yield os.path.join(dirpath, filename)
+
+
+def main(samples_root):
+    filenames = list(sample_files(samples_root))
+    if not filenames:
+        sys.exit('No sample files found under {0}'.format(samples_root))
+
+    gc.collect()
+    tracemalloc.start()
+    mocks = [AbeMock.from_filename(filename) for filename in filenames]
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('{0} sample files, {1} examples'.format(
+        len(mocks), sum(len(mock.examples) for mock in mocks)))
+    print('retained: {0:.1f} KiB ({1:.1f} KiB per file)'.format(
+        retained / 1024.0, retained / 1024.0 / len(mocks)))
+    print('peak: {0:.1f} KiB'.format(peak / 1024.0))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    main(sys.argv[1])
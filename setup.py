@@ -20,7 +20,4 @@ setup(
         'Programming Language :: Python',
         'Topic :: Software Development :: Testing',
     ],
-    install_requires=[
-        'supermutes>=0.2.5',
-    ]
 )
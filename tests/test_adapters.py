@@ -0,0 +1,157 @@
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from abe import adapters
+from abe.adapters import (
+    ContentAdapter, DRFAdapter, RawPostDataException, WSGIAdapter,
+    WSGIResponse, decode_json, get_adapter, request_data,
+)
+
+
+class ContentResponse(object):
+    """
+    Stands in for Django, requests and httpx responses.
+    """
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+
+class StreamingResponse(object):
+    """
+    Stands in for Django streaming responses, which have no content.
+    """
+    streaming = True
+
+    def __init__(self, status_code, chunks):
+        self.status_code = status_code
+        self.streaming_content = iter(chunks)
+
+
+class ReadRequest(object):
+    """
+    Stands in for a Django request whose stream was read by the view.
+    """
+    META = {'CONTENT_TYPE': 'application/json'}
+    POST = {}
+
+    @property
+    def body(self):
+        raise RawPostDataException()
+
+
+class TestDecodeJson(TestCase):
+    def test_decodes_bytes_like(self):
+        for data in (b'[1, "a"]', bytearray(b'[1, "a"]'),
+                     memoryview(b'[1, "a"]')):
+            self.assertEqual(decode_json(data), [1, 'a'])
+
+    def test_decodes_without_fast_decoder(self):
+        with patch.object(adapters, '_fast_loads', None):
+            self.assertEqual(decode_json(memoryview(b'{"a": "\xc3\xa9"}')),
+                             {'a': u'\xe9'})
+
+    def test_empty_body(self):
+        self.assertIsNone(decode_json(b''))
+
+
+class TestGetAdapter(TestCase):
+    def test_raw_bytes(self):
+        adapter = get_adapter(b'{"id": 1}')
+        self.assertIsNone(adapter.status_code)
+        self.assertEqual(adapter.data, {'id': 1})
+
+    def test_wsgi_response(self):
+        body = Mock()
+        body.__iter__ = Mock(return_value=iter([b'{"id": ', b'1}']))
+        response = WSGIResponse(
+            '201 Created', [('Content-Type', 'application/json')], body)
+        body.close.assert_called_once_with()
+        adapter = get_adapter(response)
+        self.assertIsInstance(adapter, ContentAdapter)
+        self.assertEqual(adapter.status_code, 201)
+        self.assertEqual(adapter.data, {'id': 1})
+        self.assertIs(get_adapter(response).data, adapter.data)
+
+    def test_wsgi_tuple(self):
+        adapter = get_adapter(
+            ('201 Created', [('content-type', 'application/json')],
+             [b'{"id": ', b'1}']))
+        self.assertIsInstance(adapter, WSGIAdapter)
+        self.assertEqual(adapter.status_code, 201)
+        self.assertEqual(adapter.data, {'id': 1})
+
+    def test_wsgi_tuple_requires_list_body(self):
+        adapter = get_adapter(('200 OK', [], iter([b'{"id": 1}'])))
+        with self.assertRaises(TypeError):
+            adapter.data
+
+    def test_wsgi_list_body_can_be_read_again(self):
+        response = ('200 OK', [], [b'{"id": 1}'])
+        self.assertEqual(get_adapter(response).data, {'id': 1})
+        self.assertEqual(get_adapter(response).data, {'id': 1})
+
+    def test_streaming_response(self):
+        response = StreamingResponse(200, [b'{"id": ', b'1}'])
+        adapter = get_adapter(response)
+        self.assertIsInstance(adapter, ContentAdapter)
+        self.assertEqual(adapter.status_code, 200)
+        self.assertEqual(adapter.data, {'id': 1})
+        self.assertEqual(get_adapter(response).data, {'id': 1})
+
+    def test_drf_response(self):
+        response = Mock(status_code=200, data={'id': 1})
+        self.assertIsInstance(get_adapter(response), DRFAdapter)
+
+    def test_content_response_decoded_once(self):
+        response = ContentResponse(200, b'{"id": 1}')
+        adapter = get_adapter(response)
+        self.assertIsInstance(adapter, ContentAdapter)
+        with patch.object(adapters, 'decode_json',
+                          wraps=adapters.decode_json) as decode:
+            data = adapter.data
+            self.assertIs(get_adapter(response).data, data)
+        self.assertEqual(decode.call_count, 1)
+
+    def test_non_json_body_fails_assertion(self):
+        response = ContentResponse(200, b'<html>oops</html>')
+        with self.assertRaises(AssertionError) as cm:
+            get_adapter(response).data
+        self.assertIn('<html>oops</html>', str(cm.exception))
+
+    def test_non_json_content_type_fails_assertion(self):
+        response = ContentResponse(200, b'{"id": 1}')
+        response.headers = {'Content-Type': 'text/html; charset=utf-8'}
+        self.assertRaises(AssertionError, getattr, get_adapter(response),
+                          'data')
+        response = ('200 OK', [('Content-Type', 'text/plain')], [b'1'])
+        self.assertRaises(AssertionError, getattr, get_adapter(response),
+                          'data')
+
+    def test_json_content_types(self):
+        response = ContentResponse(200, b'{"id": 1}')
+        response.headers = {'Content-Type': 'application/problem+json'}
+        self.assertEqual(get_adapter(response).data, {'id': 1})
+
+    def test_unsupported_response(self):
+        self.assertRaises(TypeError, get_adapter, 12)
+
+
+class TestRequestData(TestCase):
+    def test_json_body(self):
+        request = Mock(
+            META={'CONTENT_TYPE': 'application/json; charset=utf-8'},
+            body=b'{"name": "Jack"}', POST={},
+        )
+        self.assertEqual(request_data(request), {'name': 'Jack'})
+
+    def test_body_already_read_by_view(self):
+        parsed_request = Mock(data={'name': 'Jack'})
+        self.assertEqual(
+            request_data(ReadRequest(), parsed_request), {'name': 'Jack'})
+        self.assertRaises(AssertionError, request_data, ReadRequest())
+
+    def test_form_body(self):
+        request = Mock(META={}, POST={'name': 'Jack'})
+        self.assertEqual(request_data(request), {'name': 'Jack'})
@@ -0,0 +1,115 @@
+from os.path import abspath, dirname, join
+from unittest import TestCase, skipIf
+
+from abe.mocks import AbeMock
+
+# Module-level SkipTest is reported as an import error by the Python 2.7
+# and 3.3 test loaders, so skip the test classes instead.
+try:
+    import asyncio
+    from abe.asgi import AsyncAbeTestMixin, scope_to_meta
+except (ImportError, SyntaxError):
+    asyncio = None
+    AsyncAbeTestMixin = object
+
+requires_asgi = skipIf(asyncio is None, 'ASGI support requires Python 3.6+')
+
+DATA_DIR = join(dirname(abspath(__file__)), 'data')
+
+
+def run(*coroutines):
+    """
+    Run coroutines concurrently with asyncio.gather, return the first result.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        tasks = [asyncio.ensure_future(c, loop=loop) for c in coroutines]
+        return loop.run_until_complete(asyncio.gather(*tasks))[0]
+    finally:
+        loop.close()
+
+
+def _response(status, *chunks):
+    messages = [{'type': 'http.response.start', 'status': status,
+                 'headers': [(b'content-type', b'application/json')]}]
+    for chunk in chunks:
+        messages.append({'type': 'http.response.body', 'body': chunk,
+                         'more_body': True})
+    messages.append({'type': 'http.response.body', 'body': b''})
+    return messages
+
+
+def _scope(path='/accounts/me', method='GET', query_string=b'',
+           headers=()):
+    return {'type': 'http', 'method': method, 'path': path,
+            'query_string': query_string, 'headers': list(headers)}
+
+
+@requires_asgi
+class TestScopeToMeta(TestCase):
+
+    def test_headers_and_query_string(self):
+        meta = scope_to_meta(_scope(
+            query_string=b'foo=1&bar=2',
+            headers=[(b'content-type', b'application/json'),
+                     (b'x-custom', b'a'), (b'x-custom', b'b')],
+        ))
+        self.assertEqual(meta['QUERY_STRING'], 'foo=1&bar=2')
+        self.assertEqual(meta['CONTENT_TYPE'], 'application/json')
+        self.assertEqual(meta['HTTP_X_CUSTOM'], 'a,b')
+
+
+@requires_asgi
+class TestAssertMatchesAsgiSample(AsyncAbeTestMixin, TestCase):
+    samples_root = DATA_DIR
+
+    def test_streamed_response_matches(self):
+        run(self.assert_matches_asgi_sample(
+            'sample.json', 'unauthenticated', _scope(),
+            _response(403, b'{"detail": "Authentication credentials ',
+                      b'were not provided."}'),
+        ))
+
+    def test_response_mismatch(self):
+        with self.assertRaises(AssertionError):
+            run(self.assert_matches_asgi_sample(
+                'sample.json', 'unauthenticated', _scope(),
+                _response(403, b'{"detail": "Nope."}'),
+            ))
+
+    def test_request_mismatch(self):
+        with self.assertRaises(AssertionError):
+            run(self.assert_matches_asgi_sample(
+                'sample.json', 'unauthenticated', _scope(method='POST'),
+                _response(403, b'{"detail": "Authentication credentials '
+                               b'were not provided."}'),
+            ))
+
+    def test_request_body_and_headers(self):
+        sample_request = AbeMock({
+            'method': 'POST',
+            'url': '/accounts/',
+            'examples': {'OK': {'request': {
+                'body': {'name': 'Jack'},
+                'headers': {'Content-Type': 'application/json'},
+            }}},
+        }).examples['OK'].request
+        scope = _scope('/accounts/', 'POST',
+                       headers=[(b'content-type', b'application/json')])
+        run(self.assert_matches_asgi_request(
+            sample_request, scope, body=[b'{"name": ', b'"Jack"}']))
+        run(self.assert_matches_asgi_request(
+            sample_request, scope, body=memoryview(b'{"name": "Jack"}')))
+        with self.assertRaises(AssertionError):
+            run(self.assert_matches_asgi_request(
+                sample_request, scope, body=b'{"name": "Jill"}'))
+
+    def test_concurrent_checks(self):
+        body = (b'{"detail": "Authentication credentials '
+                b'were not provided."}')
+        run(*[
+            self.assert_matches_asgi_sample(
+                'sample.json', 'unauthenticated', _scope(),
+                _response(403, body))
+            for _ in range(10)
+        ])
@@ -1,11 +1,16 @@
+import copy
+import json
 from os.path import abspath, dirname, join
 from unittest import TestCase
 import warnings
 
-from mock import Mock
+from mock import Mock, patch
 
+from abe import matchers
+from abe.adapters import WSGIResponse
 from abe.mocks import AbeMock
 from abe.unittest import AbeTestMixin
+from abe.utils import freeze
 
 DATA_DIR = join(dirname(abspath(__file__)), 'data')
 
@@ -72,6 +77,55 @@ class TestDataListEqual(TestCase, AbeTestMixin):
             )
 
 
+class TestAssertDataEqualMemoization(TestCase, AbeTestMixin):
+
+    def setUp(self):
+        self.compared = []
+        self.assert_item_matches = self._assert_item_matches
+
+    def _assert_item_matches(self, real, sample):
+        self.compared.append(real)
+        AbeTestMixin.assert_item_matches(self, real, sample)
+
+    def test_repeated_fragments_verified_once(self):
+        user = {'id': 1, 'name': 'Jack'}
+        sample = freeze([{'id': 1, 'name': 'Jack'}] * 3, {})
+        self.assert_data_equal([user, user, user], sample)
+        self.assertEqual(len(self.compared), 2)
+
+    def test_decoded_fragments_each_verified(self):
+        sample = freeze([{'id': 1, 'name': 'Jack'}] * 3, {})
+        real = json.loads(json.dumps([{'id': 1, 'name': 'Jack'}] * 3))
+        self.assert_data_equal(real, sample)
+        self.assertEqual(len(self.compared), 6)
+
+        real[2]['name'] = 'Jill'
+        self.assertRaises(
+            AssertionError,
+            self.assert_data_equal, real, sample
+        )
+
+    def test_memo_does_not_outlive_assertion(self):
+        user = {'id': 1, 'name': 'Jack'}
+        sample = freeze({'id': 1, 'name': 'Jack'})
+        self.assert_data_equal(user, sample)
+        user['name'] = 'Jill'
+        self.assertRaises(
+            AssertionError,
+            self.assert_data_equal, user, sample
+        )
+
+    def test_memo_keeps_non_strict_apart(self):
+        user = {'id': 2, 'name': 'Jack'}
+        sample = freeze({'id': 1, 'name': 'Jack'})
+        self.assert_data_equal(
+            {'a': user}, {'a': sample}, non_strict=['a.id'])
+        self.assertRaises(
+            AssertionError,
+            self.assert_data_equal, [user, user], freeze([sample, sample])
+        )
+
+
 class TestAssertHeadersEqual(TestCase, AbeTestMixin):
 
     def test_matches_django_test_format(self):
@@ -93,6 +147,25 @@ class TestAssertHeadersEqual(TestCase, AbeTestMixin):
             {'This-Custom-Header': 'Foo'},
         )
 
+    def test_matches_case_insensitively(self):
+        self.assert_headers_contain(
+            {'CONTENT_TYPE': 'application/json', 'HTTP_X_CUSTOM': 'Foo'},
+            {'content-type': 'application/json', 'X-CUSTOM': 'Foo'},
+        )
+
+    def test_environ_keys_are_not_headers(self):
+        meta = {'SERVER_NAME': 'testserver', 'REMOTE_ADDR': '127.0.0.1'}
+        for header, value in (('Server-Name', 'testserver'),
+                              ('Remote-Addr', '127.0.0.1')):
+            with self.assertRaises(AssertionError):
+                self.assert_headers_contain(meta, {header: value})
+
+    def test_matches_sample_header_with_underscores(self):
+        self.assert_headers_contain(
+            {'HTTP_X_CUSTOM': '1'},
+            {'X_CUSTOM': '1'},
+        )
+
     def test_requires_key_and_value_match(self):
         with self.assertRaises(AssertionError):
             self.assert_headers_contain(
@@ -176,6 +249,44 @@ class TestAssertMatchesRequest(TestCase, AbeTestMixin):
             self.sample_request, self.mock_wsgi_request, non_strict=['name']
         )
 
+    def test_multi_valued_query_params(self):
+        self.sample_request.queryParams = {'tag': ['a', 'b'], 'page': 1}
+        self.mock_wsgi_request.META['QUERY_STRING'] = 'tag=a&page=1&tag=b'
+        self.assert_matches_request(
+            self.sample_request, self.mock_wsgi_request
+        )
+
+        for query_string in ('tag=a&page=1', 'tag=b&tag=a&page=1',
+                             'tag=a&tag=b&page=1&page=1'):
+            self.mock_wsgi_request.META['QUERY_STRING'] = query_string
+            with self.assertRaises(AssertionError):
+                self.assert_matches_request(
+                    self.sample_request, self.mock_wsgi_request
+                )
+
+    def test_matches_json_body(self):
+        self.mock_wsgi_request.POST = {}
+        self.mock_wsgi_request.META['CONTENT_TYPE'] = 'application/json'
+        self.mock_wsgi_request.body = b'{"name": "My Resource"}'
+        self.assert_matches_request(
+            self.sample_request, self.mock_wsgi_request
+        )
+
+    def test_changed_sample_request_is_recompiled(self):
+        self.assert_matches_request(
+            self.sample_request, self.mock_wsgi_request
+        )
+        for field, value in (('queryParams', {'foo': '2'}),
+                             ('headers', {'This-Custom-Header': 'Bar'}),
+                             ('url', '/other/'),
+                             ('method', 'PUT')):
+            sample_request = copy.copy(self.sample_request)
+            setattr(sample_request, field, value)
+            with self.assertRaises(AssertionError):
+                self.assert_matches_request(
+                    sample_request, self.mock_wsgi_request
+                )
+
     def test_assertion_error_if_query_params_mismatch(self):
         self.mock_wsgi_request.META['QUERY_STRING'] = "foo=1"
         with self.assertRaises(AssertionError):
@@ -226,6 +337,33 @@ class TestAssertMatchesResponse(TestCase, AbeTestMixin):
             sample, response
         )
 
+    def test_raw_and_wsgi_responses(self):
+        sample = _abe_wrap_response({
+            "status": 201,
+            "body": {"id": 12, "name": "My Resource"}
+        })
+        body = b'{"id": 12, "name": "My Resource"}'
+        self.assert_matches_response(sample, body)
+        self.assert_matches_response(sample, ('201 CREATED', [], [body]))
+        self.assertRaises(
+            AssertionError,
+            self.assert_matches_response,
+            sample, ('200 OK', [], [body])
+        )
+
+    def test_wsgi_response_asserted_twice(self):
+        sample = _abe_wrap_response({"status": 200, "body": {"id": 1}})
+        response = WSGIResponse('200 OK', [], iter([b'{"id": 1}']))
+        self.assert_matches_response(sample, response)
+        self.assert_matches_response(sample, response)
+
+    def test_non_json_response_fails_assertion(self):
+        sample = _abe_wrap_response({"status": 200, "body": {"id": 1}})
+        self.assertRaises(
+            AssertionError,
+            self.assert_matches_response, sample, b'<html>oops</html>'
+        )
+
     def test_strict_response_mismatch(self):
         sample = _abe_wrap_response({
             "status": 201,
@@ -406,3 +544,136 @@ class TestFilenameInstantiation(TestCase):
 
     def test_from_filename(self):
         AbeMock.from_filename(self.filename)
+
+
+class TestCompactRepresentation(TestCase, AbeTestMixin):
+    samples_root = DATA_DIR
+
+    def test_records_have_no_instance_dict(self):
+        sample = AbeMock.from_filename(join(DATA_DIR, 'sample.json'))
+        example = sample.examples['OK']
+        for record in (sample, example, example.request, example.response):
+            self.assertFalse(hasattr(record, '__dict__'))
+
+    def test_fields_accessible_as_attributes_and_keys(self):
+        sample = AbeMock.from_filename(join(DATA_DIR, 'sample.json'))
+        response = sample.examples['OK'].response
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response['status'], 200)
+        self.assertEqual(response.body.username, 'user-0')
+        self.assertIn('body', response)
+        self.assertNotIn('headers', response)
+
+    def test_unknown_fields_and_methods_are_not_fields(self):
+        sample = AbeMock({
+            "method": "GET",
+            "url": "/resource/",
+            "examples": {
+                "OK": {"request": {"extra": {"a": 1}, "custom": 2}},
+                "clash": {"response": {
+                    "keys": "k", "get": "g", "_extra": "e", "status": 200,
+                }},
+            }
+        })
+        request = sample.examples['OK'].request
+        self.assertEqual(request.extra, {'a': 1})
+        self.assertEqual(request['custom'], 2)
+        self.assertEqual(request.get('custom'), 2)
+
+        response = sample.examples['clash'].response
+        for name, value in (('keys', 'k'), ('get', 'g'), ('_extra', 'e')):
+            self.assertIn(name, response)
+            self.assertEqual(response[name], value)
+            self.assertEqual(response.get(name), value)
+        self.assertIn("'keys': 'k'", repr(response))
+
+        for name in ('keys', 'get', '_extra', 'headers'):
+            self.assertNotIn(name, request)
+            self.assertIsNone(request.get(name))
+            self.assertRaises(KeyError, request.__getitem__, name)
+
+    def test_records_can_be_copied(self):
+        sample = AbeMock.from_filename(join(DATA_DIR, 'sample.json'))
+        for copied in (copy.copy(sample), copy.deepcopy(sample)):
+            response = copied.examples['OK'].response
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.body.username, 'user-0')
+
+        request = copy.deepcopy(sample.examples['OK'].request)
+        request.url = '/somewhere/else'
+        self.assertEqual(sample.examples['OK'].request.url, '/accounts/me')
+
+    def test_fragments_shared_within_a_sample_only(self):
+        data = {
+            "method": "GET",
+            "url": "/resource/",
+            "examples": {
+                "one": {"response": {"status": 404,
+                                     "body": {"detail": "Not found."}}},
+                "two": {"response": {"status": 404,
+                                     "body": {"detail": "Not found."}}},
+            }
+        }
+        examples = AbeMock(data).examples
+        self.assertIs(examples['one'].response.body,
+                      examples['two'].response.body)
+        self.assertIsNot(examples['one'].response.body,
+                         AbeMock(data).examples['one'].response.body)
+
+    def test_strings_shared_across_samples(self):
+        filename = join(DATA_DIR, 'sample.json')
+        body1 = AbeMock.from_filename(filename).examples['OK'].response.body
+        body2 = AbeMock.from_filename(filename).examples['OK'].response.body
+        self.assertIs(body1['username'], body2['username'])
+
+    def test_sample_requests_compiled_once_per_label(self):
+        response = Mock(
+            status_code=200,
+            data={
+                "id": 1,
+                "username": "user-0",
+                "first_name": "",
+                "last_name": "",
+                "email": "user-0@example.com"
+            },
+            renderer_context={},
+        )
+        response.wsgi_request.META = {
+            'PATH_INFO': '/accounts/me',
+            'REQUEST_METHOD': 'GET',
+            'QUERY_STRING': '',
+        }
+        self._compiled_requests = {}
+        with patch.object(matchers, 'CompiledRequest',
+                          wraps=matchers.CompiledRequest) as compiled:
+            self.assert_matches_sample('sample.json', 'OK', response)
+            self.assert_matches_sample('sample.json', 'OK', response)
+        self.assertEqual(compiled.call_count, 1)
+
+    def test_loaded_samples_are_independent(self):
+        sample = self.load_sample('sample.json')
+        sample.examples['OK'].response.status = 500
+        self.assertEqual(
+            self.load_sample('sample.json').examples['OK'].response.status,
+            200
+        )
+
+    def test_get_sample_request_returns_mutable_copy(self):
+        sample = AbeMock({
+            "method": "POST",
+            "url": "/resource/",
+            "examples": {
+                "OK": {"request": {"body": {"tags": ["a", "b"]}}}
+            }
+        })
+        body = sample.examples['OK'].request.body
+        self.assertEqual(body.tags, ('a', 'b'))
+        self.assertRaises(TypeError, body.__setitem__, 'tags', [])
+
+        self.load_sample = lambda path: sample
+        body = self.get_sample_request('sample.json', 'OK')
+        body['tags'].append('c')
+        self.assertEqual(body, {'tags': ['a', 'b', 'c']})
+        self.assertEqual(body.tags, ['a', 'b', 'c'])
+        body.name = 'Jack'
+        self.assertEqual(body['name'], 'Jack')
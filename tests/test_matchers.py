@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from abe.matchers import (
+    compile_query_params, compile_request, parse_query, wsgi_header_keys,
+)
+from abe.mocks import AbeMock
+
+
+class TestWsgiHeaderKeys(TestCase):
+    def test_keys(self):
+        self.assertEqual(wsgi_header_keys('X-Custom'), ('HTTP_X_CUSTOM',))
+        self.assertEqual(wsgi_header_keys('x_custom'), ('HTTP_X_CUSTOM',))
+        self.assertEqual(
+            wsgi_header_keys('content-length'),
+            ('CONTENT_LENGTH', 'HTTP_CONTENT_LENGTH')
+        )
+
+
+class TestQueryParams(TestCase):
+    def test_parse_repeated_and_blank_params(self):
+        self.assertEqual(
+            parse_query('tag=a&page=2&tag=b&q='),
+            {'tag': ['a', 'b'], 'page': ['2'], 'q': ['']}
+        )
+
+    def test_compile_normalizes_values(self):
+        compiled = dict(compile_query_params({
+            'tag': ['a', 'b'], 'page': 2, 'exact': True, 'q': 'x'
+        }))
+        self.assertEqual(compiled, {
+            'tag': ('a', 'b'), 'page': ('2',), 'exact': ('true',),
+            'q': ('x',)
+        })
+
+
+class TestCompileRequest(TestCase):
+    def test_compiled_once_per_sample_request(self):
+        sample_request = AbeMock({
+            'method': 'GET',
+            'url': '/search/',
+            'examples': {'OK': {'request': {'queryParams': {'q': 'x'}}}},
+        }).examples['OK'].request
+        compiled = compile_request(sample_request)
+        self.assertEqual(compiled.url, '/search/')
+        self.assertIsNone(compiled.headers)
+        self.assertEqual(compiled.query_params, (('q', ('x',)),))
+        self.assertIs(compile_request(sample_request), compiled)
+
+    def test_plain_dict_request(self):
+        compiled = compile_request({'url': '/', 'headers': {'X-A': '1'}})
+        self.assertEqual(compiled.headers, (('X-A', ('HTTP_X_A',), '1'),))
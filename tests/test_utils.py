@@ -1,9 +1,37 @@
 from unittest import TestCase
 
-from abe.utils import subkeys
+from abe.utils import freeze, subkeys, thaw
 
 
 class TestSubkeys(TestCase):
     def test_subkeys(self):
         new_keys = subkeys(['key.one', 'key.two', 'hello', 'keyring'], 'key')
         self.assertEqual(new_keys, ['one', 'two'])
+
+
+class TestFreeze(TestCase):
+    def test_freeze_and_thaw_roundtrip(self):
+        data = {'one': [1, {'two': 'three'}], 'four': None}
+        frozen = freeze(data)
+        self.assertEqual(frozen['one'], (1, {'two': 'three'}))
+        self.assertEqual(frozen.one[1].two, 'three')
+        self.assertEqual(thaw(frozen), data)
+
+    def test_frozen_data_is_read_only(self):
+        frozen = freeze({'one': 1})
+        self.assertRaises(TypeError, frozen.__setitem__, 'one', 2)
+        self.assertRaises(TypeError, frozen.update, {'one': 2})
+
+    def test_identical_subtrees_are_shared(self):
+        error = {'detail': 'Not found.', 'code': 404}
+        consed = {}
+        frozen = freeze(
+            {'one': [error, dict(error)], 'two': {'e': error}}, consed)
+        self.assertIs(frozen.one[0], frozen.one[1])
+        self.assertIs(frozen.one[0], frozen.two.e)
+        self.assertIsNot(
+            freeze({'id': 1}, consed), freeze({'id': True}, consed))
+
+    def test_subtrees_not_shared_without_table(self):
+        frozen = freeze([{'id': 1}, {'id': 1}])
+        self.assertIsNot(frozen[0], frozen[1])